@@ -45,8 +45,14 @@ class QueryManager(object):
             # Save each method in the initializer -> callable format
             column_transformers[submission_method] = create_submission_transformer(method)
 
+        extra_transformers = EXTRA_TRANSFORMERS.copy()
+
+        # Every query's extras may use any of the column transformers that actually submit data
+        submission_transformers = column_transformers.copy()
+        submission_transformers.pop('tag')
+
         for query in self.queries:
-            query.compile(column_transformers, EXTRA_TRANSFORMERS.copy())
+            query.compile(column_transformers, extra_transformers, submission_transformers)
 
     def execute(self):
         logger = self.check.log
@@ -54,10 +60,12 @@ class QueryManager(object):
 
         for query in self.queries:
             query_name = query.name
-            query_columns = query.columns
+            column_names = query.column_names
+            column_types = query.column_types
+            column_transformers = query.column_transformers
             query_extras = query.extras
             query_tags = query.tags
-            num_columns = len(query_columns)
+            num_columns = len(column_names)
 
             try:
                 rows = self.execute_query(query.query)
@@ -90,15 +98,15 @@ class QueryManager(object):
                 tags = list(global_tags)
                 tags.extend(query_tags)
 
-                for (column_name, transformer), value in zip(query_columns, row):
+                for column_name, column_type, transformer, value in zip(
+                    column_names, column_types, column_transformers, row
+                ):
                     # Columns can be ignored via configuration
                     if not column_name:
                         continue
 
                     sources[column_name] = value
 
-                    column_type, transformer = transformer
-
                     # The transformer can be None for `source` types. Those such columns do not submit
                     # anything but are collected into the row values for other columns to reference.
                     if transformer is None:
@@ -109,11 +117,11 @@ class QueryManager(object):
                         submission_queue.append((transformer, value))
 
                 for transformer, value in submission_queue:
-                    transformer(value, sources, tags=tags)
+                    transformer(value, sources, tags)
 
                 for name, transformer in query_extras:
                     try:
-                        result = transformer(sources, tags=tags)
+                        result = transformer(sources, tags)
                     except Exception as e:
                         logger.error('Error transforming %s: %s', name, e)
                         continue
@@ -1,8 +1,6 @@
 # (C) Datadog, Inc. 2019
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
-from copy import deepcopy
-
 from six import raise_from
 
 from .utils import create_extra_transformer
@@ -10,14 +8,18 @@ from .utils import create_extra_transformer
 
 class Query(object):
     def __init__(self, query_data):
-        self.query_data = deepcopy(query_data or {})
+        # Compilation only reads from the definition so a shallow copy is enough to
+        # protect the caller's data from the defaults that get filled in
+        self.query_data = dict(query_data or {})
         self.name = None
         self.query = None
-        self.columns = None
+        self.column_names = None
+        self.column_types = None
+        self.column_transformers = None
         self.extras = None
         self.tags = None
 
-    def compile(self, column_transformers, extra_transformers):
+    def compile(self, column_transformers, extra_transformers, submission_transformers=None):
         # Check for previous compilation
         if self.name is not None:
             return
@@ -44,14 +46,18 @@ class Query(object):
         if tags is not None and not isinstance(tags, list):
             raise ValueError('field `tags` for {} must be a list'.format(query_name))
 
-        # Keep track of all defined names
+        if submission_transformers is None:
+            submission_transformers = column_transformers.copy()
+            submission_transformers.pop('tag')
+
+        # Keep track of all defined names as a mapping of name -> (kind, index)
         sources = {}
 
         column_data = []
         for i, column in enumerate(columns, 1):
             # Columns can be ignored via configuration.
             if not column:
-                column_data.append((None, None))
+                column_data.append((None, None, None))
                 continue
             elif not isinstance(column, dict):
                 raise ValueError('column #{} of {} is not a mapping'.format(i, query_name))
@@ -64,11 +70,11 @@ class Query(object):
             elif column_name in sources:
                 raise ValueError(
                     'the name {} of {} was already defined in {} #{}'.format(
-                        column_name, query_name, sources[column_name]['type'], sources[column_name]['index']
+                        column_name, query_name, *sources[column_name]
                     )
                 )
 
-            sources[column_name] = {'type': 'column', 'index': i}
+            sources[column_name] = ('column', i)
 
             column_type = column.get('type')
             if not column_type:
@@ -76,15 +82,19 @@ class Query(object):
             elif not isinstance(column_type, str):
                 raise ValueError('field `type` for column {} of {} must be a string'.format(column_name, query_name))
             elif column_type == 'source':
-                column_data.append((column_name, (None, None)))
+                column_data.append((column_name, None, None))
                 continue
-            elif column_type not in column_transformers:
+
+            transformer_factory = column_transformers.get(column_type)
+            if transformer_factory is None:
                 raise ValueError('unknown type `{}` for column {} of {}'.format(column_type, column_name, query_name))
 
-            modifiers = {key: value for key, value in column.items() if key not in ('name', 'type')}
+            modifiers = column.copy()
+            del modifiers['name']
+            del modifiers['type']
 
             try:
-                transformer = column_transformers[column_type](column_name, column_transformers, **modifiers)
+                transformer = transformer_factory(column_name, column_transformers, **modifiers)
             except Exception as e:
                 error = 'error compiling type `{}` for column {} of {}: {}'.format(
                     column_type, column_name, query_name, e
@@ -97,14 +107,11 @@ class Query(object):
                 raise_from(type(e)(error), None)
             else:
                 if column_type == 'tag':
-                    column_data.append((column_name, (column_type, transformer)))
+                    column_data.append((column_name, column_type, transformer))
                 else:
                     # All these would actually submit data. As that is the default case, we represent it as
                     # a reference to None since if we use e.g. `value` it would never be checked anyway.
-                    column_data.append((column_name, (None, transformer)))
-
-        submission_transformers = column_transformers.copy()
-        submission_transformers.pop('tag')
+                    column_data.append((column_name, None, transformer))
 
         extras = self.query_data.get('extras', [])
         if not isinstance(extras, list):
@@ -123,11 +130,11 @@ class Query(object):
             elif extra_name in sources:
                 raise ValueError(
                     'the name {} of {} was already defined in {} #{}'.format(
-                        extra_name, query_name, sources[extra_name]['type'], sources[extra_name]['index']
+                        extra_name, query_name, *sources[extra_name]
                     )
                 )
 
-            sources[extra_name] = {'type': 'extra', 'index': i}
+            sources[extra_name] = ('extra', i)
 
             extra_type = extra.get('type')
             if not extra_type:
@@ -137,19 +144,27 @@ class Query(object):
                     raise ValueError('field `type` for extra {} of {} is required'.format(extra_name, query_name))
             elif not isinstance(extra_type, str):
                 raise ValueError('field `type` for extra {} of {} must be a string'.format(extra_name, query_name))
-            elif extra_type not in extra_transformers and extra_type not in submission_transformers:
-                raise ValueError('unknown type `{}` for extra {} of {}'.format(extra_type, extra_name, query_name))
 
-            transformer_factory = extra_transformers.get(extra_type, submission_transformers.get(extra_type))
+            transformer_factory = submission_transformers.get(extra_type)
+            is_submission = transformer_factory is not None
+            if not is_submission:
+                transformer_factory = extra_transformers.get(extra_type)
+                if transformer_factory is None:
+                    raise ValueError('unknown type `{}` for extra {} of {}'.format(extra_type, extra_name, query_name))
 
             extra_source = extra.get('source')
-            if extra_type in submission_transformers:
+            if is_submission:
                 if not extra_source:
                     raise ValueError('field `source` for extra {} of {} is required'.format(extra_name, query_name))
 
-                modifiers = {key: value for key, value in extra.items() if key not in ('name', 'type', 'source')}
+                modifiers = extra.copy()
+                del modifiers['name']
+                del modifiers['type']
+                del modifiers['source']
             else:
-                modifiers = {key: value for key, value in extra.items() if key not in ('name', 'type')}
+                modifiers = extra.copy()
+                del modifiers['name']
+                modifiers.pop('type', None)
                 modifiers['sources'] = sources
 
             try:
@@ -159,14 +174,15 @@ class Query(object):
 
                 raise_from(type(e)(error), None)
             else:
-                if extra_type in submission_transformers:
+                if is_submission:
                     transformer = create_extra_transformer(transformer, extra_source)
 
                 extra_data.append((extra_name, transformer))
 
         self.name = query_name
         self.query = query
-        self.columns = tuple(column_data)
+        # Store the columns as parallel tuples that can be zipped with each row
+        self.column_names, self.column_types, self.column_transformers = zip(*column_data)
         self.extras = tuple(extra_data)
-        self.tags = tags
+        self.tags = tuple(tags or ())
         del self.query_data
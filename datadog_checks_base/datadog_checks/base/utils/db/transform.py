@@ -22,16 +22,31 @@ ALLOWED_GLOBALS = {
 # Simple heuristic to not mistake a source for part of a string (which we also transform it into)
 SOURCE_PATTERN = r'(?<!"|\')({})(?!"|\')'
 
+# String forms of the values seen by `boolean` tags
+BOOLEAN_TAG_VALUES = {}
+BOOLEAN_TAG_VALUES_SIZE = 128
+
+# Compiled expressions, as the same ones tend to be used by every instance of a check
+EXPRESSION_CACHE = {}
+EXPRESSION_CACHE_SIZE = 512
+
+# Compiled `SOURCE_PATTERN`s keyed by the sorted sources they match
+SOURCE_PATTERN_CACHE = {}
+SOURCE_PATTERN_CACHE_SIZE = 128
+
 
 def get_tag(column_name, transformers, **modifiers):
-    template = '{}:{{}}'.format(column_name)
-    boolean = is_affirmative(modifiers.pop('boolean', None))
+    prefix = '{}:'.format(column_name)
+
+    if is_affirmative(modifiers.pop('boolean', None)):
+
+        def boolean_tag(value, *_):
+            return prefix + _get_boolean_tag_value(value)
 
-    def tag(value, *_, **kwargs):
-        if boolean:
-            value = str(is_affirmative(value)).lower()
+        return boolean_tag
 
-        return template.format(value)
+    def tag(value, *_):
+        return prefix + str(value)
 
     return tag
 
@@ -40,9 +55,9 @@ def get_monotonic_gauge(column_name, transformers, **modifiers):
     gauge = transformers['gauge']('{}.total'.format(column_name), transformers, **modifiers)
     monotonic_count = transformers['monotonic_count']('{}.count'.format(column_name), transformers, **modifiers)
 
-    def monotonic_gauge(value, *_, **kwargs):
-        gauge(value, **kwargs)
-        monotonic_count(value, **kwargs)
+    def monotonic_gauge(value, sources, tags=None):
+        gauge(value, sources, tags)
+        monotonic_count(value, sources, tags)
 
     return monotonic_gauge
 
@@ -65,20 +80,20 @@ def get_temporal_percent(column_name, transformers, **modifiers):
 
     rate = transformers['rate'](column_name, transformers, **modifiers)
 
-    def temporal_percent(value, *_, **kwargs):
-        rate(total_time_to_temporal_percent(value, scale=scale), **kwargs)
+    def temporal_percent(value, sources, tags=None):
+        rate(total_time_to_temporal_percent(value, scale=scale), sources, tags)
 
     return temporal_percent
 
 
 def get_match(column_name, transformers, **modifiers):
     # Do work in a separate function to avoid having to `del` a bunch of variables
-    compiled_items = _compile_match_items(transformers, modifiers)
+    item_sources, item_transformers = _compile_match_items(transformers, modifiers)
 
-    def match(value, sources, *_, **kwargs):
-        if value in compiled_items:
-            source, transformer = compiled_items[value]
-            transformer(sources[source], **kwargs)
+    def match(value, sources, tags=None):
+        transformer = item_transformers.get(value)
+        if transformer is not None:
+            transformer(sources[item_sources[value]], sources, tags)
 
     return match
 
@@ -94,43 +109,29 @@ def get_expression(name, transformers, **modifiers):
     elif not expression:
         raise ValueError('the `expression` parameter must not be empty')
 
-    if not modifiers.pop('verbose', False):
-        # Sort the sources in reverse order of length to prevent greedy matching
-        available_sources = sorted(available_sources, key=lambda s: -len(s))
-
-        # Escape special characters, mostly for the possible dots in metric names
-        available_sources = list(map(re.escape, available_sources))
-
-        # Finally, utilize the order by relying on the guarantees provided by the alternation operator
-        available_sources = '|'.join(available_sources)
-
-        expression = re.sub(
-            SOURCE_PATTERN.format(available_sources),
-            # Replace by the particular source that matched
-            lambda match_obj: 'SOURCES["{}"]'.format(match_obj.group(1)),
-            expression,
-        )
-
-    expression = compile(expression, filename=name, mode='eval')
+    code = _compile_expression(name, expression, available_sources, modifiers.pop('verbose', False))
+    evaluate = eval(code, ALLOWED_GLOBALS)
 
     del available_sources
 
     if 'submit_type' in modifiers:
-        if modifiers['submit_type'] not in transformers:
-            raise ValueError('unknown submit_type `{}`'.format(modifiers['submit_type']))
+        submit_type = modifiers.pop('submit_type')
+        transformer_factory = transformers.get(submit_type)
+        if transformer_factory is None:
+            raise ValueError('unknown submit_type `{}`'.format(submit_type))
 
-        submit_method = transformers[modifiers.pop('submit_type')](name, transformers, **modifiers)
+        submit_method = transformer_factory(name, transformers, **modifiers)
         submit_method = create_extra_transformer(submit_method)
 
-        def execute_expression(sources, **kwargs):
-            result = eval(expression, ALLOWED_GLOBALS, {'SOURCES': sources})
-            submit_method(sources, result, **kwargs)
+        def execute_expression(sources, tags=None):
+            result = evaluate(sources)
+            submit_method(sources, result, tags)
             return result
 
     else:
 
-        def execute_expression(sources, **kwargs):
-            return eval(expression, ALLOWED_GLOBALS, {'SOURCES': sources})
+        def execute_expression(sources, tags=None):
+            return evaluate(sources)
 
     return execute_expression
 
@@ -158,8 +159,8 @@ def get_percent(name, transformers, **modifiers):
     gauge = transformers['gauge'](name, transformers, **modifiers)
     gauge = create_extra_transformer(gauge)
 
-    def percent(sources, **kwargs):
-        gauge(sources, compute_percent(sources[part], sources[total]), **kwargs)
+    def percent(sources, tags=None):
+        gauge(sources, compute_percent(sources[part], sources[total]), tags)
 
     return percent
 
@@ -174,6 +175,77 @@ COLUMN_TRANSFORMERS = {
 EXTRA_TRANSFORMERS = {'expression': get_expression, 'percent': get_percent}
 
 
+def _get_boolean_tag_value(value):
+    # Boolean columns only ever contain a handful of distinct values. The type is part of the key since
+    # `is_affirmative` depends on it, e.g. `'no'` and `u'no'` are equal on Python 2 but only one is a `str`.
+    cache_key = (type(value), value)
+    try:
+        tag_value = BOOLEAN_TAG_VALUES.get(cache_key)
+    except TypeError:
+        # Unhashable values are simply not cached
+        return str(is_affirmative(value)).lower()
+
+    if tag_value is None:
+        tag_value = str(is_affirmative(value)).lower()
+        if len(BOOLEAN_TAG_VALUES) < BOOLEAN_TAG_VALUES_SIZE:
+            BOOLEAN_TAG_VALUES[cache_key] = tag_value
+
+    return tag_value
+
+
+def _compile_expression(name, expression, available_sources, verbose):
+    sources = None if verbose else tuple(sorted(available_sources))
+
+    # The name is the filename of the code object, so it is part of the key to keep tracebacks accurate
+    cache_key = (name, expression, sources)
+
+    # Read the entry only once as other checks may clear the cache at any time
+    code = EXPRESSION_CACHE.get(cache_key)
+    if code is not None:
+        return code
+
+    if not verbose:
+        expression = _get_source_pattern(sources).sub(
+            # Replace by the particular source that matched
+            lambda match_obj: 'SOURCES["{}"]'.format(match_obj.group(1)),
+            expression,
+        )
+
+    # Ensure the expression is valid on its own before wrapping it
+    compile(expression, filename=name, mode='eval')
+
+    # Evaluating this produces a function that takes the sources as an argument,
+    # so rows can be processed without creating a namespace for `eval` each time
+    code = compile('lambda SOURCES: (\n{}\n)'.format(expression), filename=name, mode='eval')
+
+    if len(EXPRESSION_CACHE) >= EXPRESSION_CACHE_SIZE:
+        EXPRESSION_CACHE.clear()
+
+    EXPRESSION_CACHE[cache_key] = code
+    return code
+
+
+def _get_source_pattern(sources):
+    # Every extra of a query sees mostly the same sources, so only build the pattern once per set. Read
+    # the entry only once as other checks may clear the cache at any time.
+    pattern = SOURCE_PATTERN_CACHE.get(sources)
+    if pattern is not None:
+        return pattern
+
+    # 1. Sort the sources in reverse order of length to prevent greedy matching
+    # 2. Escape special characters, mostly for the possible dots in metric names
+    # 3. Utilize the order by relying on the guarantees provided by the alternation operator
+    alternation = '|'.join(re.escape(source) for source in sorted(sources, key=len, reverse=True))
+
+    pattern = re.compile(SOURCE_PATTERN.format(alternation))
+
+    if len(SOURCE_PATTERN_CACHE) >= SOURCE_PATTERN_CACHE_SIZE:
+        SOURCE_PATTERN_CACHE.clear()
+
+    SOURCE_PATTERN_CACHE[sources] = pattern
+    return pattern
+
+
 def _compile_match_items(transformers, modifiers):
     items = modifiers.pop('items', None)
     if items is None:
@@ -184,18 +256,19 @@ def _compile_match_items(transformers, modifiers):
 
     global_transform_source = modifiers.pop('source', None)
 
-    compiled_items = {}
+    item_sources = {}
+    item_transformers = {}
     for item, data in items.items():
         if not isinstance(data, dict):
             raise ValueError('item `{}` is not a mapping'.format(item))
 
-        transform_name = data.pop('name', None)
+        transform_name = data.get('name')
         if not transform_name:
             raise ValueError('the `name` parameter for item `{}` is required'.format(item))
         elif not isinstance(transform_name, str):
             raise ValueError('the `name` parameter for item `{}` must be a string'.format(item))
 
-        transform_type = data.pop('type', None)
+        transform_type = data.get('type')
         if not transform_type:
             raise ValueError('the `type` parameter for item `{}` is required'.format(item))
         elif not isinstance(transform_type, str):
@@ -203,17 +276,18 @@ def _compile_match_items(transformers, modifiers):
         elif transform_type not in transformers:
             raise ValueError('unknown type `{}` for item `{}`'.format(transform_type, item))
 
-        transform_source = data.pop('source', global_transform_source)
+        transform_source = data.get('source', global_transform_source)
         if not transform_source:
             raise ValueError('the `source` parameter for item `{}` is required'.format(item))
         elif not isinstance(transform_source, str):
             raise ValueError('the `source` parameter for item `{}` must be a string'.format(item))
 
-        transform_modifiers = modifiers.copy()
-        transform_modifiers.update(data)
-        compiled_items[item] = (
-            transform_source,
-            transformers[transform_type](transform_name, transformers, **transform_modifiers),
-        )
+        # Item settings take precedence, merged in a single call rather than a copy followed by an update
+        transform_modifiers = dict(modifiers, **data)
+        transform_modifiers.pop('name')
+        transform_modifiers.pop('type')
+        transform_modifiers.pop('source', None)
+        item_sources[item] = transform_source
+        item_transformers[item] = transformers[transform_type](transform_name, transformers, **transform_modifiers)
 
-    return compiled_items
+    return item_sources, item_transformers
@@ -6,9 +6,17 @@ SUBMISSION_METHODS = {'gauge', 'count', 'monotonic_count', 'rate', 'histogram',
 
 def create_submission_transformer(submit_method):
     def get_transformer(name, _, **modifiers):
-        def transformer(value, *_, **kwargs):
-            kwargs.update(modifiers)
-            submit_method(name, value, **kwargs)
+        # Tags configured for this transformer take precedence over those of the row
+        if 'tags' in modifiers:
+            configured_tags = modifiers.pop('tags')
+
+            def transformer(value, sources=None, tags=None):
+                submit_method(name, value, tags=configured_tags, **modifiers)
+
+        else:
+
+            def transformer(value, sources=None, tags=None):
+                submit_method(name, value, tags=tags, **modifiers)
 
         return transformer
 
@@ -21,13 +29,13 @@ def create_extra_transformer(column_transformer, source=None):
     # transformer we just map the proper source to the value.
     if source:
 
-        def call_transformer(sources, **kwargs):
-            return column_transformer(sources[source], sources, **kwargs)
+        def call_transformer(sources, tags=None):
+            return column_transformer(sources[source], sources, tags)
 
     # Extra transformers that call regular transformers will want to pass values directly.
     else:
 
-        def call_transformer(sources, value, **kwargs):
-            return column_transformer(value, sources, **kwargs)
+        def call_transformer(sources, value, tags=None):
+            return column_transformer(value, sources, tags)
 
     return call_transformer
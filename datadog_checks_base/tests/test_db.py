@@ -2,12 +2,14 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import logging
+from copy import deepcopy
 
 import pytest
 
 from datadog_checks.base import AgentCheck
 from datadog_checks.base.stubs.aggregator import AggregatorStub
 from datadog_checks.base.utils.db import Query, QueryManager
+from datadog_checks.base.utils.db.transform import EXPRESSION_CACHE
 
 pytestmark = pytest.mark.db
 
@@ -202,6 +204,28 @@ class TestQueryCompilation:
         query_manager.compile_queries()
         query_manager.compile_queries()
 
+    def test_query_data_not_modified(self):
+        query_data = {
+            'query': 'foo',
+            'columns': [
+                {
+                    'name': 'columnar',
+                    'type': 'match',
+                    'items': {'global': {'name': 'test.global', 'type': 'gauge', 'source': 'test1'}},
+                },
+                {'name': 'test1', 'type': 'source'},
+            ],
+            'tags': ['test:bar'],
+        }
+        expected = deepcopy(query_data)
+
+        query_manager = create_query_manager(
+            check=AgentCheck('test', {}, [{'custom_queries': [query_data]}]), executor=mock_executor([['global', 5]])
+        )
+        query_manager.compile_queries()
+
+        assert query_data == expected
+
     def test_extras_not_list(self):
         query_manager = create_query_manager(
             {
@@ -1055,6 +1079,42 @@ class TestColumnTransformers:
         )
         aggregator.assert_all_metrics_covered()
 
+    def test_tag_boolean_equal_values_of_different_types(self, aggregator):
+        class Text(object):
+            # Compares equal to strings without being one, like `unicode` on Python 2
+            def __init__(self, value):
+                self.value = value
+
+            def __eq__(self, other):
+                return self.value == other
+
+            def __hash__(self):
+                return hash(self.value)
+
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [
+                    {'name': 'affirmative', 'type': 'tag', 'boolean': True},
+                    {'name': 'test.foo', 'type': 'gauge'},
+                ],
+                'tags': ['test:bar'],
+            },
+            executor=mock_executor([['no', 5], [Text('no'), 7]]),
+            tags=['test:foo'],
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        aggregator.assert_metric(
+            'test.foo', 5, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar', 'affirmative:false']
+        )
+        aggregator.assert_metric(
+            'test.foo', 7, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar', 'affirmative:true']
+        )
+        aggregator.assert_all_metrics_covered()
+
     def test_monotonic_gauge(self, aggregator):
         query_manager = create_query_manager(
             {
@@ -1240,6 +1300,68 @@ class TestExtraTransformers:
         )
         aggregator.assert_all_metrics_covered()
 
+    def test_expression_distinct_sources(self, aggregator):
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [{'name': 'test.foo', 'type': 'gauge'}, {'name': 'test.bar', 'type': 'gauge'}],
+                'extras': [{'name': 'sum', 'expression': 'test.foo + test.bar', 'submit_type': 'gauge'}],
+                'tags': ['test:bar'],
+            },
+            executor=mock_executor([[5, 2]]),
+            tags=['test:foo'],
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        aggregator.assert_metric('test.foo', 5, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar'])
+        aggregator.assert_metric('test.bar', 2, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar'])
+        aggregator.assert_metric('sum', 7, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar'])
+        aggregator.assert_all_metrics_covered()
+
+    def test_expression_overlapping_sources(self, aggregator):
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [{'name': 'foo.bar', 'type': 'gauge'}, {'name': 'bar.real', 'type': 'gauge'}],
+                'extras': [{'name': 'sum', 'expression': 'foo.bar.real + 1', 'submit_type': 'gauge'}],
+                'tags': ['test:bar'],
+            },
+            executor=mock_executor([[5, 2]]),
+            tags=['test:foo'],
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        aggregator.assert_metric('foo.bar', 5, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar'])
+        aggregator.assert_metric('bar.real', 2, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar'])
+        aggregator.assert_metric('sum', 6, metric_type=aggregator.GAUGE, tags=['test:foo', 'test:bar'])
+        aggregator.assert_all_metrics_covered()
+
+    def test_expression_cached(self, aggregator):
+        query_data = {
+            'name': 'test query',
+            'query': 'foo',
+            'columns': [{'name': 'test.foo', 'type': 'gauge'}, {'name': 'test.bar', 'type': 'gauge'}],
+            'extras': [{'name': 'test.cached_sum', 'expression': 'test.foo + test.bar', 'submit_type': 'gauge'}],
+        }
+
+        query_manager1 = create_query_manager(deepcopy(query_data), executor=mock_executor([[5, 2]]))
+        query_manager1.compile_queries()
+        num_cached = len(EXPRESSION_CACHE)
+
+        query_manager2 = create_query_manager(deepcopy(query_data), executor=mock_executor([[3, 1]]))
+        query_manager2.compile_queries()
+        assert len(EXPRESSION_CACHE) == num_cached
+
+        query_manager1.execute()
+        query_manager2.execute()
+
+        aggregator.assert_metric('test.cached_sum', 7, metric_type=aggregator.GAUGE)
+        aggregator.assert_metric('test.cached_sum', 4, metric_type=aggregator.GAUGE)
+
     def test_expression_detect_type(self, aggregator):
         query_manager = create_query_manager(
             {
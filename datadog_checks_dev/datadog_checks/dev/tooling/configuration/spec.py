@@ -3,585 +3,518 @@
 # Licensed under a 3-clause BSD style license (see LICENSE)
 from .utils import default_option_example, normalize_source_name
 
+# Distinguishes absent attributes from ones explicitly set to a falsy value
+MISSING = object()
+
+# Unlike `isinstance`, this excludes booleans
+NUMBER_TYPES = (int, float)
+
+# Optional attributes of every option as (name, type, description of the type), the
+# type being called with no arguments to create the default value when missing
+OPTION_DEFAULTS = (
+    ('required', bool, 'true or false'),
+    ('hidden', bool, 'true or false'),
+    ('deprecation', dict, 'a mapping object'),
+    ('metadata_tags', list, 'an array'),
+)
+
+# Error messages, formatted with the source of the spec
+SPEC_NOT_MAPPING = '{}: Configuration specifications must be a mapping object'
+SPEC_NAME_MISSING = '{}: Configuration specifications must contain a top-level `name` attribute'
+SPEC_NAME_NOT_STRING = '{}: The top-level `name` attribute must be a string'
+SPEC_VERSION_MISSING = '{}: Configuration specifications must contain a top-level `version` attribute'
+SPEC_VERSION_NOT_STRING = '{}: The top-level `version` attribute must be a string'
+SPEC_FILES_MISSING = '{}: Configuration specifications must contain a top-level `files` attribute'
+SPEC_FILES_NOT_ARRAY = '{}: The top-level `files` attribute must be an array'
+
+# Error messages, formatted with the source of the spec and the file index or name
+FILE_NOT_MAPPING = '{}, file #{}: File attribute must be a mapping object'
+FILE_NAME_MISSING = (
+    '{}, file #{}: Every file must contain a `name` attribute representing the final destination the Agent loads'
+)
+FILE_NAME_NOT_STRING = '{}, file #{}: Attribute `name` must be a string'
+FILE_NAME_USED = '{}, file #{}: File name `{}` already used by file #{}'
+FILE_NAME_UNEXPECTED = '{}, file #{}: File name `{}` should be `{}`'
+FILE_EXAMPLE_NAME_UNEXPECTED = '{}, file #{}: Example file name `{}` should be `{}`'
+FILE_EXAMPLE_NAME_NOT_STRING = '{}, file #{}: Attribute `example_name` must be a string'
+FILE_EXAMPLE_NAME_USED = '{}, file #{}: Example file name `{}` already used by file #{}'
+FILE_OPTIONS_MISSING = '{}, {}: Every file must contain an `options` attribute'
+FILE_OPTIONS_NOT_ARRAY = '{}, {}: The `options` attribute must be an array'
+
+# Error messages, appended to or formatted with the prefix of the option
+OPTION_NOT_MAPPING = 'Option attribute must be a mapping object'
+OPTION_TEMPLATE_NOT_MAPPING = 'Template option must be a mapping object'
+OPTION_TEMPLATE_EMPTY = 'Template refers to an empty array'
+OPTION_TEMPLATE_INVALID = 'Template does not refer to a mapping object nor array'
+OPTION_NAME_MISSING = 'Every option must contain a `name` attribute'
+OPTION_NAME_NOT_STRING = 'Attribute `name` must be a string'
+OPTION_NAME_USED = '{}Option name `{}` already used by option #{}'
+OPTION_DESCRIPTION_MISSING = 'Every option must contain a `description` attribute'
+OPTION_DESCRIPTION_NOT_STRING = 'Attribute `description` must be a string'
+OPTION_ATTRIBUTE_INVALID = '{}Attribute `{}` must be {}'
+OPTION_DEPRECATION_NOT_STRING = '{}Key `{}` for attribute `deprecation` must be a string'
+OPTION_METADATA_TAGS_NOT_STRINGS = 'Attribute `metadata_tags` must only contain strings'
+OPTION_VALUE_AND_OPTIONS = 'An option cannot contain both `value` and `options` attributes'
+OPTION_VALUE_NOT_MAPPING = 'Attribute `value` must be a mapping object'
+OPTION_SECRET_NOT_BOOLEAN = 'Attribute `secret` must be true or false'
+OPTION_OPTIONS_NOT_ARRAY = 'The `options` attribute must be an array'
+OPTION_MULTIPLE_NOT_BOOLEAN = 'Attribute `multiple` must be true or false'
+
+# Error messages, appended to or formatted with the prefix of the option and the type of the value
+VALUE_TYPE_MISSING = 'Every value must contain a `type` attribute'
+VALUE_TYPE_NOT_STRING = 'Attribute `type` must be a string'
+VALUE_TYPE_UNKNOWN = '{}Unknown type `{}`'
+VALUE_ATTRIBUTE_NOT_STRING = '{}Attribute `{}` for `type` {} must be a string'
+VALUE_ATTRIBUTE_NOT_NUMBER = '{}Attribute `{}` for `type` {} must be a number'
+VALUE_ATTRIBUTE_NOT_INTEGER = '{}Attribute `{}` for `type` {} must be an integer'
+VALUE_ATTRIBUTE_NOT_BOOLEAN = '{}Attribute `{}` for `type` {} must be true or false'
+VALUE_ATTRIBUTE_NOT_ARRAY = '{}Attribute `{}` for `type` {} must be an array'
+VALUE_ATTRIBUTE_NOT_MAPPING = '{}Attribute `{}` for `type` {} must be a mapping object'
+VALUE_ATTRIBUTE_NOT_GREATER = '{}Attribute `{}` for `type` {} must be greater than attribute `{}`'
+VALUE_EXAMPLE_MISSING = '{}Every {} must contain a default `example` attribute'
+VALUE_ITEMS_MISSING = '{}Every {} must contain an `items` attribute'
+VALUE_REQUIRED_EMPTY = '{}Remove attribute `required` for `type` {} if no properties are required'
+VALUE_REQUIRED_NOT_UNIQUE = '{}All entries in attribute `required` for `type` {} must be unique'
+VALUE_REQUIRED_UNDEFINED = (
+    '{}All entries in attribute `required` for `type` {} must be defined in the`properties` attribute'
+)
+VALUE_PROPERTY_NOT_MAPPING = '{}Every entry in `properties` for `type` {} must be a mapping object'
+VALUE_PROPERTY_NAME_MISSING = '{}Every entry in `properties` for `type` {} must contain a `name` attribute'
+VALUE_PROPERTIES_NOT_UNIQUE = '{}All entries in attribute `properties` for `type` {} must have unique names'
+
 
 def spec_validator(spec, loader):
-    if not isinstance(spec, dict):
-        loader.errors.append('{}: Configuration specifications must be a mapping object'.format(loader.source))
+    errors_append = loader.errors.append
+    source = loader.source
+
+    if type(spec) is not dict:
+        errors_append(SPEC_NOT_MAPPING.format(source))
         return
 
     if 'name' not in spec:
-        loader.errors.append(
-            '{}: Configuration specifications must contain a top-level `name` attribute'.format(loader.source)
-        )
+        errors_append(SPEC_NAME_MISSING.format(source))
         return
 
     name = spec['name']
-    if not isinstance(name, str):
-        loader.errors.append('{}: The top-level `name` attribute must be a string'.format(loader.source))
+    if type(name) is not str:
+        errors_append(SPEC_NAME_NOT_STRING.format(source))
         return
 
     release_version = spec.setdefault('version', loader.version)
     if not release_version:
-        loader.errors.append(
-            '{}: Configuration specifications must contain a top-level `version` attribute'.format(loader.source)
-        )
+        errors_append(SPEC_VERSION_MISSING.format(source))
         return
-    elif not isinstance(release_version, str):
-        loader.errors.append('{}: The top-level `version` attribute must be a string'.format(loader.source))
+    elif type(release_version) is not str:
+        errors_append(SPEC_VERSION_NOT_STRING.format(source))
         return
 
     if 'files' not in spec:
-        loader.errors.append(
-            '{}: Configuration specifications must contain a top-level `files` attribute'.format(loader.source)
-        )
+        errors_append(SPEC_FILES_MISSING.format(source))
         return
 
     files = spec['files']
-    if not isinstance(files, list):
-        loader.errors.append('{}: The top-level `files` attribute must be an array'.format(loader.source))
+    if type(files) is not list:
+        errors_append(SPEC_FILES_NOT_ARRAY.format(source))
         return
 
     files_validator(files, loader)
 
 
 def files_validator(files, loader):
-    num_files = len(files)
+    errors_append = loader.errors.append
+    source = loader.source
+
+    # A lone file must be named after the integration
+    expected_name = None
+    if len(files) == 1:
+        expected_name = normalize_source_name(source or 'conf') + '.yaml'
+
+    # Maps the kind and value of every file name to the index of the file that first used it
     file_names_origin = {}
-    example_file_names_origin = {}
     for file_index, config_file in enumerate(files, 1):
-        if not isinstance(config_file, dict):
-            loader.errors.append(
-                '{}, file #{}: File attribute must be a mapping object'.format(loader.source, file_index)
-            )
+        if type(config_file) is not dict:
+            errors_append(FILE_NOT_MAPPING.format(source, file_index))
             continue
 
         if 'name' not in config_file:
-            loader.errors.append(
-                '{}, file #{}: Every file must contain a `name` attribute representing the '
-                'final destination the Agent loads'.format(loader.source, file_index)
-            )
+            errors_append(FILE_NAME_MISSING.format(source, file_index))
             continue
 
         file_name = config_file['name']
-        if not isinstance(file_name, str):
-            loader.errors.append('{}, file #{}: Attribute `name` must be a string'.format(loader.source, file_index))
+        if type(file_name) is not str:
+            errors_append(FILE_NAME_NOT_STRING.format(source, file_index))
             continue
 
-        if file_name in file_names_origin:
-            loader.errors.append(
-                '{}, file #{}: File name `{}` already used by file #{}'.format(
-                    loader.source, file_index, file_name, file_names_origin[file_name]
-                )
-            )
-        else:
-            file_names_origin[file_name] = file_index
+        file_name_used_validator(
+            file_names_origin, 'name', file_name, file_index, FILE_NAME_USED, errors_append, source
+        )
 
         if file_name == 'auto_conf.yaml':
             if 'example_name' in config_file and config_file['example_name'] != file_name:
-                loader.errors.append(
-                    '{}, file #{}: Example file name `{}` should be `{}`'.format(
-                        loader.source, file_index, config_file['example_name'], file_name
-                    )
+                errors_append(
+                    FILE_EXAMPLE_NAME_UNEXPECTED.format(source, file_index, config_file['example_name'], file_name)
                 )
 
             example_file_name = config_file.setdefault('example_name', file_name)
         else:
-            if num_files == 1:
-                expected_name = '{}.yaml'.format(normalize_source_name(loader.source or 'conf'))
-                if file_name != expected_name:
-                    loader.errors.append(
-                        '{}, file #{}: File name `{}` should be `{}`'.format(
-                            loader.source, file_index, file_name, expected_name
-                        )
-                    )
+            if expected_name is not None and file_name != expected_name:
+                errors_append(FILE_NAME_UNEXPECTED.format(source, file_index, file_name, expected_name))
 
             example_file_name = config_file.setdefault('example_name', 'conf.yaml.example')
 
-        if not isinstance(example_file_name, str):
-            loader.errors.append(
-                '{}, file #{}: Attribute `example_name` must be a string'.format(loader.source, file_index)
-            )
-
-        if example_file_name in example_file_names_origin:
-            loader.errors.append(
-                '{}, file #{}: Example file name `{}` already used by file #{}'.format(
-                    loader.source, file_index, example_file_name, example_file_names_origin[example_file_name]
-                )
-            )
-        else:
-            example_file_names_origin[example_file_name] = file_index
+        if type(example_file_name) is not str:
+            errors_append(FILE_EXAMPLE_NAME_NOT_STRING.format(source, file_index))
+
+        file_name_used_validator(
+            file_names_origin,
+            'example_name',
+            example_file_name,
+            file_index,
+            FILE_EXAMPLE_NAME_USED,
+            errors_append,
+            source,
+        )
 
         if 'options' not in config_file:
-            loader.errors.append(
-                '{}, {}: Every file must contain an `options` attribute'.format(loader.source, file_name)
-            )
+            errors_append(FILE_OPTIONS_MISSING.format(source, file_name))
             continue
 
         options = config_file['options']
-        if not isinstance(options, list):
-            loader.errors.append('{}, {}: The `options` attribute must be an array'.format(loader.source, file_name))
+        if type(options) is not list:
+            errors_append(FILE_OPTIONS_NOT_ARRAY.format(source, file_name))
             continue
 
         options_validator(options, loader, file_name)
 
 
-def options_validator(options, loader, file_name, *sections):
-    sections_display = ', '.join(sections)
-    if sections_display:
-        sections_display += ', '
+def file_name_used_validator(file_names_origin, kind, file_name, file_index, message, errors_append, source):
+    # The kind keeps file and example file names from colliding with each other
+    file_name_origin = file_names_origin.setdefault((kind, file_name), file_index)
+    if file_name_origin != file_index:
+        errors_append(message.format(source, file_index, file_name, file_name_origin))
 
-    option_names_origin = {}
-    for option_index, option in enumerate(options, 1):
-        if not isinstance(option, dict):
-            loader.errors.append(
-                '{}, {}, {}option #{}: Option attribute must be a mapping object'.format(
-                    loader.source, file_name, sections_display, option_index
-                )
-            )
-            continue
 
-        if 'template' in option:
-            parameters = {
-                parameter: option.pop(parameter) for parameter in loader.templates.fields if parameter in option
-            }
+def options_validator(options, loader, file_name, sections_display=''):
+    errors_append = loader.errors.append
+    source = loader.source
+    templates = loader.templates
 
-            try:
-                template = loader.templates.load(option.pop('template'), parameters)
-            except Exception as e:
-                loader.errors.append(
-                    '{}, {}, {}option #{}: {}'.format(loader.source, file_name, sections_display, option_index, e)
-                )
+    # Values that passed validation in this file, see `value_validator`
+    validated_values = {}
+
+    # Nested options are queued rather than validated recursively
+    stack = [(options, sections_display)]
+    while stack:
+        options, sections_display = stack.pop()
+
+        # Every error shares the same context so only build it once
+        base_prefix = str(source) + ', ' + file_name + ', ' + sections_display
+
+        option_names_origin = {}
+        nested_groups = []
+        # Templates may expand into several options in place so the length is not fixed
+        option_index = 0
+        while option_index < len(options):
+            option = options[option_index]
+            option_index += 1
+            index_prefix = base_prefix + 'option #' + str(option_index) + ': '
+
+            if type(option) is not dict:
+                errors_append(index_prefix + OPTION_NOT_MAPPING)
                 continue
 
-            if isinstance(template, dict):
-                template.update(option)
-                option = template
-                options[option_index - 1] = template
-            elif isinstance(template, list):
-                if template:
-                    option = template[0]
-                    for item_index, template_item in enumerate(template):
-                        options.insert(option_index + item_index, template_item)
-
-                    # Delete what's at the current index
-                    options.pop(option_index - 1)
-
-                    # Perform this check once again
-                    if not isinstance(option, dict):
-                        loader.errors.append(
-                            '{}, {}, {}option #{}: Template option must be a mapping object'.format(
-                                loader.source, file_name, sections_display, option_index
-                            )
-                        )
+            if 'template' in option:
+                parameters = {parameter: option.pop(parameter) for parameter in templates.fields if parameter in option}
+
+                try:
+                    template = templates.load(option.pop('template'), parameters)
+                except Exception as e:
+                    errors_append(index_prefix + str(e))
+                    continue
+
+                if type(template) is dict:
+                    template.update(option)
+                    option = template
+                    options[option_index - 1] = template
+                elif type(template) is list:
+                    if template:
+                        option = template[0]
+
+                        # Replace what's at the current index
+                        options[option_index - 1 : option_index] = template
+
+                        # Perform this check once again
+                        if type(option) is not dict:
+                            errors_append(index_prefix + OPTION_TEMPLATE_NOT_MAPPING)
+                            continue
+                    else:
+                        errors_append(index_prefix + OPTION_TEMPLATE_EMPTY)
                         continue
                 else:
-                    loader.errors.append(
-                        '{}, {}, {}option #{}: Template refers to an empty array'.format(
-                            loader.source, file_name, sections_display, option_index
-                        )
-                    )
+                    errors_append(index_prefix + OPTION_TEMPLATE_INVALID)
                     continue
-            else:
-                loader.errors.append(
-                    '{}, {}, {}option #{}: Template does not refer to a mapping object nor array'.format(
-                        loader.source, file_name, sections_display, option_index
-                    )
-                )
+
+            if 'name' not in option:
+                errors_append(index_prefix + OPTION_NAME_MISSING)
                 continue
 
-        if 'name' not in option:
-            loader.errors.append(
-                '{}, {}, {}option #{}: Every option must contain a `name` attribute'.format(
-                    loader.source, file_name, sections_display, option_index
-                )
-            )
-            continue
+            option_name = option['name']
+            if type(option_name) is not str:
+                errors_append(index_prefix + OPTION_NAME_NOT_STRING)
 
-        option_name = option['name']
-        if not isinstance(option_name, str):
-            loader.errors.append(
-                '{}, {}, {}option #{}: Attribute `name` must be a string'.format(
-                    loader.source, file_name, sections_display, option_index
-                )
-            )
-
-        if option_name in option_names_origin:
-            loader.errors.append(
-                '{}, {}, {}option #{}: Option name `{}` already used by option #{}'.format(
-                    loader.source,
-                    file_name,
-                    sections_display,
-                    option_index,
-                    option_name,
-                    option_names_origin[option_name],
-                )
-            )
-        else:
-            option_names_origin[option_name] = option_index
+            option_name_origin = option_names_origin.setdefault(option_name, option_index)
+            if option_name_origin != option_index:
+                errors_append(OPTION_NAME_USED.format(index_prefix, option_name, option_name_origin))
 
-        if 'description' not in option:
-            loader.errors.append(
-                '{}, {}, {}{}: Every option must contain a `description` attribute'.format(
-                    loader.source, file_name, sections_display, option_name
-                )
-            )
-            continue
+            prefix = base_prefix + str(option_name) + ': '
 
-        description = option['description']
-        if not isinstance(description, str):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `description` must be a string'.format(
-                    loader.source, file_name, sections_display, option_name, description
-                )
-            )
+            if 'description' not in option:
+                errors_append(prefix + OPTION_DESCRIPTION_MISSING)
+                continue
 
-        option.setdefault('required', False)
-        if not isinstance(option['required'], bool):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `required` must be true or false'.format(
-                    loader.source, file_name, sections_display, option_name
-                )
-            )
+            description = option['description']
+            if type(description) is not str:
+                errors_append(prefix + OPTION_DESCRIPTION_NOT_STRING)
+
+            for attribute, attribute_type, type_description in OPTION_DEFAULTS:
+                attribute_value = option.get(attribute, MISSING)
+                if attribute_value is MISSING:
+                    option[attribute] = attribute_type()
+                elif type(attribute_value) is not attribute_type:
+                    errors_append(OPTION_ATTRIBUTE_INVALID.format(prefix, attribute, type_description))
+
+            deprecation = option['deprecation']
+            if type(deprecation) is dict:
+                for key, info in deprecation.items():
+                    if type(info) is not str:
+                        errors_append(OPTION_DEPRECATION_NOT_STRING.format(prefix, key))
+
+            metadata_tags = option['metadata_tags']
+            if type(metadata_tags) is list:
+                for metadata_tag in metadata_tags:
+                    if type(metadata_tag) is not str:
+                        errors_append(prefix + OPTION_METADATA_TAGS_NOT_STRINGS)
+
+            if 'value' in option and 'options' in option:
+                errors_append(prefix + OPTION_VALUE_AND_OPTIONS)
+                continue
 
-        option.setdefault('hidden', False)
-        if not isinstance(option['hidden'], bool):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `hidden` must be true or false'.format(
-                    loader.source, file_name, sections_display, option_name
-                )
-            )
+            if 'value' in option:
+                value = option['value']
+                if type(value) is not dict:
+                    errors_append(prefix + OPTION_VALUE_NOT_MAPPING)
+                    continue
 
-        option.setdefault('deprecation', {})
-        if not isinstance(option['deprecation'], dict):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `deprecation` must be a mapping object'.format(
-                    loader.source, file_name, sections_display, option_name
-                )
-            )
-        else:
-            for key, info in option['deprecation'].items():
-                if not isinstance(info, str):
-                    loader.errors.append(
-                        '{}, {}, {}{}: Key `{}` for attribute `deprecation` must be a string'.format(
-                            loader.source, file_name, sections_display, option_name, key
-                        )
-                    )
-
-        option.setdefault('metadata_tags', [])
-        if not isinstance(option['metadata_tags'], list):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `metadata_tags` must be an array'.format(
-                    loader.source, file_name, sections_display, option_name
-                )
-            )
+                secret = option.get('secret', MISSING)
+                if secret is MISSING:
+                    option['secret'] = False
+                elif type(secret) is not bool:
+                    errors_append(prefix + OPTION_SECRET_NOT_BOOLEAN)
+
+                value_validator(value, loader, prefix, option_name, validated_values=validated_values)
+            elif 'options' in option:
+                nested_options = option['options']
+                if type(nested_options) is not list:
+                    errors_append(prefix + OPTION_OPTIONS_NOT_ARRAY)
+                    continue
+
+                multiple = option.get('multiple', MISSING)
+                if multiple is MISSING:
+                    option['multiple'] = False
+                elif type(multiple) is not bool:
+                    errors_append(prefix + OPTION_MULTIPLE_NOT_BOOLEAN)
+
+                nested_groups.append((nested_options, sections_display + str(option_name) + ', '))
+
+        # Reverse so that groups are popped in their defined order
+        stack.extend(reversed(nested_groups))
+
+
+def value_validator(value, loader, prefix, option_name, depth=0, validated_values=None):
+    errors = loader.errors
+    errors_append = errors.append
+
+    # Callers validating many values may share this mapping of value identities to the values nested within
+    if validated_values is None:
+        validated_values = {}
+
+    # Nested values are queued rather than validated recursively
+    stack = [(value, depth)]
+    while stack:
+        value, depth = stack.pop()
+
+        # The same object may be referenced many times, e.g. by YAML aliases, so only check it once. Only
+        # top-level values are checked differently so the exact depth does not matter.
+        validated_key = (id(value), bool(depth))
+        if validated_key in validated_values:
+            nested_values = validated_values[validated_key][1]
         else:
-            for metadata_tag in option['metadata_tags']:
-                if not isinstance(metadata_tag, str):
-                    loader.errors.append(
-                        '{}, {}, {}{}: Attribute `metadata_tags` must only contain strings'.format(
-                            loader.source, file_name, sections_display, option_name
-                        )
-                    )
-
-        if 'value' in option and 'options' in option:
-            loader.errors.append(
-                '{}, {}, {}{}: An option cannot contain both `value` and `options` attributes'.format(
-                    loader.source, file_name, sections_display, option_name
-                )
-            )
-            continue
+            num_errors = len(errors)
 
-        if 'value' in option:
-            value = option['value']
-            if not isinstance(value, dict):
-                loader.errors.append(
-                    '{}, {}, {}{}: Attribute `value` must be a mapping object'.format(
-                        loader.source, file_name, sections_display, option_name
-                    )
-                )
+            if 'type' not in value:
+                errors_append(prefix + VALUE_TYPE_MISSING)
                 continue
 
-            option.setdefault('secret', False)
-            if not isinstance(option['secret'], bool):
-                loader.errors.append(
-                    '{}, {}, {}{}: Attribute `secret` must be true or false'.format(
-                        loader.source, file_name, sections_display, option_name
-                    )
-                )
+            value_type = value['type']
+            if type(value_type) is not str:
+                errors_append(prefix + VALUE_TYPE_NOT_STRING)
+                continue
 
-            value_validator(value, loader, file_name, sections_display, option_name, depth=0)
-        elif 'options' in option:
-            nested_options = option['options']
-            if not isinstance(nested_options, list):
-                loader.errors.append(
-                    '{}, {}, {}{}: The `options` attribute must be an array'.format(
-                        loader.source, file_name, sections_display, option_name
-                    )
-                )
+            validator = VALUE_VALIDATORS.get(value_type)
+            if validator is None:
+                errors_append(VALUE_TYPE_UNKNOWN.format(prefix, value_type))
                 continue
 
-            option.setdefault('multiple', False)
-            if not isinstance(option['multiple'], bool):
-                loader.errors.append(
-                    '{}, {}, {}{}: Attribute `multiple` must be true or false'.format(
-                        loader.source, file_name, sections_display, option_name
-                    )
-                )
+            # Every type has an example so only look it up once. Validators return the values nested within, if any.
+            example = value.get('example', MISSING)
+            nested_values = validator(value, value_type, example, errors_append, prefix, option_name, depth)
 
-            previous_sections = list(sections)
-            previous_sections.append(option_name)
-            options_validator(nested_options, loader, file_name, *previous_sections)
+            # Values with errors are checked every time so that each option referencing them is reported. The
+            # value itself is kept so that its `id` cannot be reused by another object.
+            if len(errors) == num_errors:
+                validated_values[validated_key] = (value, nested_values)
 
+        if nested_values:
+            depth += 1
 
-def value_validator(value, loader, file_name, sections_display, option_name, depth=0):
-    if 'type' not in value:
-        loader.errors.append(
-            '{}, {}, {}{}: Every value must contain a `type` attribute'.format(
-                loader.source, file_name, sections_display, option_name
-            )
-        )
-        return
+            # Reverse so that values are popped in their defined order
+            stack.extend((nested_value, depth) for nested_value in reversed(nested_values))
 
-    value_type = value['type']
-    if not isinstance(value_type, str):
-        loader.errors.append(
-            '{}, {}, {}{}: Attribute `type` must be a string'.format(
-                loader.source, file_name, sections_display, option_name
-            )
-        )
-        return
 
-    if value_type == 'string':
-        if 'example' not in value:
-            if not depth:
-                value['example'] = default_option_example(option_name)
-        elif not isinstance(value['example'], str):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `example` for `type` {} must be a string'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
+def string_validator(value, value_type, example, errors_append, prefix, option_name, depth):
+    if example is MISSING:
+        if not depth:
+            value['example'] = default_option_example(option_name)
+    elif type(example) is not str:
+        errors_append(VALUE_ATTRIBUTE_NOT_STRING.format(prefix, 'example', value_type))
 
-        if 'pattern' in value and not isinstance(value['pattern'], str):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `pattern` for `type` {} must be a string'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-    elif value_type in ('integer', 'number'):
-        if 'example' not in value:
-            if not depth:
-                value['example'] = default_option_example(option_name)
-        elif not isinstance(value['example'], (int, float)):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `example` for `type` {} must be a number'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
+    if 'pattern' in value and type(value['pattern']) is not str:
+        errors_append(VALUE_ATTRIBUTE_NOT_STRING.format(prefix, 'pattern', value_type))
 
-        minimum_valid = True
-        maximum_valid = True
 
-        if 'minimum' in value and not isinstance(value['minimum'], (int, float)):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `minimum` for `type` {} must be a number'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            minimum_valid = False
+def number_validator(value, value_type, example, errors_append, prefix, option_name, depth):
+    if example is MISSING:
+        if not depth:
+            value['example'] = default_option_example(option_name)
+    elif type(example) not in NUMBER_TYPES:
+        errors_append(VALUE_ATTRIBUTE_NOT_NUMBER.format(prefix, 'example', value_type))
 
-        if 'maximum' in value and not isinstance(value['maximum'], (int, float)):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `maximum` for `type` {} must be a number'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            maximum_valid = False
-
-        if (
-            'minimum' in value
-            and 'maximum' in value
-            and minimum_valid
-            and maximum_valid
-            and value['maximum'] <= value['minimum']
-        ):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `maximum` for `type` {} must be greater than attribute `minimum`'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-    elif value_type == 'boolean':
-        if 'example' not in value:
-            if not depth:
-                loader.errors.append(
-                    '{}, {}, {}{}: Every {} must contain a default `example` attribute'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
-        elif not isinstance(value['example'], bool):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `example` for `type` {} must be true or false'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-    elif value_type == 'array':
-        if 'example' not in value:
-            if not depth:
-                value['example'] = []
-        elif not isinstance(value['example'], list):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `example` for `type` {} must be an array'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
+    # Invalid bounds are treated as missing so they are not compared
+    minimum = value.get('minimum', MISSING)
+    if minimum is not MISSING and type(minimum) not in NUMBER_TYPES:
+        errors_append(VALUE_ATTRIBUTE_NOT_NUMBER.format(prefix, 'minimum', value_type))
+        minimum = MISSING
 
-        if 'uniqueItems' in value and not isinstance(value['uniqueItems'], bool):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `uniqueItems` for `type` {} must be true or false'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
+    maximum = value.get('maximum', MISSING)
+    if maximum is not MISSING and type(maximum) not in NUMBER_TYPES:
+        errors_append(VALUE_ATTRIBUTE_NOT_NUMBER.format(prefix, 'maximum', value_type))
+        maximum = MISSING
 
-        min_items_valid = True
-        max_items_valid = True
+    if minimum is not MISSING and maximum is not MISSING and maximum <= minimum:
+        errors_append(VALUE_ATTRIBUTE_NOT_GREATER.format(prefix, 'maximum', value_type, 'minimum'))
 
-        if 'minItems' in value and not isinstance(value['minItems'], int):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `minItems` for `type` {} must be an integer'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            min_items_valid = False
 
-        if 'maxItems' in value and not isinstance(value['maxItems'], int):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `maxItems` for `type` {} must be an integer'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            max_items_valid = False
-
-        if (
-            'minItems' in value
-            and 'maxItems' in value
-            and min_items_valid
-            and max_items_valid
-            and value['maxItems'] <= value['minItems']
-        ):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `maxItems` for `type` {} must be greater than attribute `minItems`'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
+def boolean_validator(value, value_type, example, errors_append, prefix, option_name, depth):
+    if example is MISSING:
+        if not depth:
+            errors_append(VALUE_EXAMPLE_MISSING.format(prefix, value_type))
+    elif type(example) is not bool:
+        errors_append(VALUE_ATTRIBUTE_NOT_BOOLEAN.format(prefix, 'example', value_type))
 
-        if 'items' not in value:
-            loader.errors.append(
-                '{}, {}, {}{}: Every {} must contain an `items` attribute'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            return
-
-        items = value['items']
-        if not isinstance(items, dict):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `items` for `type` {} must be a mapping object'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            return
-
-        value_validator(items, loader, file_name, sections_display, option_name, depth=depth + 1)
-    elif value_type == 'object':
-        if 'example' not in value:
-            if not depth:
-                value['example'] = {}
-        elif not isinstance(value['example'], dict):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `example` for `type` {} must be a mapping object'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-
-        required = value.get('required')
-        if 'required' in value:
-            if not isinstance(required, list):
-                loader.errors.append(
-                    '{}, {}, {}{}: Attribute `required` for `type` {} must be an array'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
-                required = None
-            elif not required:
-                loader.errors.append(
-                    '{}, {}, {}{}: Remove attribute `required` for `type` {} if no properties are required'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
-            elif len(required) - len(set(required)):
-                loader.errors.append(
-                    '{}, {}, {}{}: All entries in attribute `required` for `type` {} must be unique'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
 
-        properties = value.setdefault('properties', [])
-        if not isinstance(properties, list):
-            loader.errors.append(
-                '{}, {}, {}{}: Attribute `properties` for `type` {} must be an array'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-            return
-
-        new_depth = depth + 1
-        property_names = []
-        for prop in properties:
-            if not isinstance(prop, dict):
-                loader.errors.append(
-                    '{}, {}, {}{}: Every entry in `properties` for `type` {} must be a mapping object'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
+def array_validator(value, value_type, example, errors_append, prefix, option_name, depth):
+    if example is MISSING:
+        if not depth:
+            value['example'] = []
+    elif type(example) is not list:
+        errors_append(VALUE_ATTRIBUTE_NOT_ARRAY.format(prefix, 'example', value_type))
 
-            if 'name' not in prop:
-                loader.errors.append(
-                    '{}, {}, {}{}: Every entry in `properties` for `type` {} must contain a `name` attribute'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
-                continue
+    if 'uniqueItems' in value and type(value['uniqueItems']) is not bool:
+        errors_append(VALUE_ATTRIBUTE_NOT_BOOLEAN.format(prefix, 'uniqueItems', value_type))
 
-            name = prop['name']
-            if not isinstance(name, str):
-                loader.errors.append(
-                    '{}, {}, {}{}: Attribute `name` for `type` {} must be a string'.format(
-                        loader.source, file_name, sections_display, option_name, value_type
-                    )
-                )
-                continue
+    # Invalid bounds are treated as missing so they are not compared
+    min_items = value.get('minItems', MISSING)
+    if min_items is not MISSING and type(min_items) is not int:
+        errors_append(VALUE_ATTRIBUTE_NOT_INTEGER.format(prefix, 'minItems', value_type))
+        min_items = MISSING
 
-            property_names.append(name)
+    max_items = value.get('maxItems', MISSING)
+    if max_items is not MISSING and type(max_items) is not int:
+        errors_append(VALUE_ATTRIBUTE_NOT_INTEGER.format(prefix, 'maxItems', value_type))
+        max_items = MISSING
 
-            value_validator(prop, loader, file_name, sections_display, option_name, depth=new_depth)
+    if min_items is not MISSING and max_items is not MISSING and max_items <= min_items:
+        errors_append(VALUE_ATTRIBUTE_NOT_GREATER.format(prefix, 'maxItems', value_type, 'minItems'))
 
-        if len(property_names) - len(set(property_names)):
-            loader.errors.append(
-                '{}, {}, {}{}: All entries in attribute `properties` for `type` {} must have unique names'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
+    if 'items' not in value:
+        errors_append(VALUE_ITEMS_MISSING.format(prefix, value_type))
+        return
 
-        if required and set(required).difference(property_names):
-            loader.errors.append(
-                '{}, {}, {}{}: All entries in attribute `required` for `type` '
-                '{} must be defined in the`properties` attribute'.format(
-                    loader.source, file_name, sections_display, option_name, value_type
-                )
-            )
-    else:
-        loader.errors.append(
-            '{}, {}, {}{}: Unknown type `{}`'.format(
-                loader.source, file_name, sections_display, option_name, value_type
-            )
-        )
+    items = value['items']
+    if type(items) is not dict:
+        errors_append(VALUE_ATTRIBUTE_NOT_MAPPING.format(prefix, 'items', value_type))
+        return
+
+    return [items]
+
+
+def object_validator(value, value_type, example, errors_append, prefix, option_name, depth):
+    if example is MISSING:
+        if not depth:
+            value['example'] = {}
+    elif type(example) is not dict:
+        errors_append(VALUE_ATTRIBUTE_NOT_MAPPING.format(prefix, 'example', value_type))
+
+    required_set = None
+    if 'required' in value:
+        required = value['required']
+        if type(required) is not list:
+            errors_append(VALUE_ATTRIBUTE_NOT_ARRAY.format(prefix, 'required', value_type))
+        elif not required:
+            errors_append(VALUE_REQUIRED_EMPTY.format(prefix, value_type))
+        else:
+            required_set = set(required)
+            if len(required_set) != len(required):
+                errors_append(VALUE_REQUIRED_NOT_UNIQUE.format(prefix, value_type))
+
+    properties = value.setdefault('properties', [])
+    if type(properties) is not list:
+        errors_append(VALUE_ATTRIBUTE_NOT_ARRAY.format(prefix, 'properties', value_type))
+        return
+
+    property_names = []
+    nested_values = []
+    for prop in properties:
+        if type(prop) is not dict:
+            errors_append(VALUE_PROPERTY_NOT_MAPPING.format(prefix, value_type))
+
+        if 'name' not in prop:
+            errors_append(VALUE_PROPERTY_NAME_MISSING.format(prefix, value_type))
+            continue
+
+        name = prop['name']
+        if type(name) is not str:
+            errors_append(VALUE_ATTRIBUTE_NOT_STRING.format(prefix, 'name', value_type))
+            continue
+
+        property_names.append(name)
+        nested_values.append(prop)
+
+    property_set = set(property_names)
+    if len(property_set) != len(property_names):
+        errors_append(VALUE_PROPERTIES_NOT_UNIQUE.format(prefix, value_type))
+
+    if required_set and not required_set.issubset(property_set):
+        errors_append(VALUE_REQUIRED_UNDEFINED.format(prefix, value_type))
+
+    return nested_values
+
+
+VALUE_VALIDATORS = {
+    'string': string_validator,
+    'integer': number_validator,
+    'number': number_validator,
+    'boolean': boolean_validator,
+    'array': array_validator,
+    'object': object_validator,
+}
@@ -1,11 +1,10 @@
 # (C) Datadog, Inc. 2019
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
-from copy import deepcopy
-
 import yaml
 
 from ...utils import file_exists, get_parent_dir, path_join, read_file
+from .utils import copy_data, freeze_data
 
 TEMPLATES_DIR = path_join(get_parent_dir(get_parent_dir(__file__)), 'templates', 'configuration')
 VALID_EXTENSIONS = ('yaml', 'yml')
@@ -14,6 +13,7 @@ VALID_EXTENSIONS = ('yaml', 'yml')
 class ConfigTemplates(object):
     def __init__(self, paths=None):
         self.templates = {}
+        self.resolved = {}
         self.paths = []
 
         if paths:
@@ -24,6 +24,21 @@ class ConfigTemplates(object):
         self.fields = {'overrides': (self.override, lambda: {})}
 
     def load(self, template, parameters=None):
+        # Specs reference the same few templates many times so remember the final result, which
+        # callers are free to modify since they always receive a copy
+        cache_key = (template, freeze_data(parameters))
+        try:
+            resolved = cache_key in self.resolved
+        except TypeError:
+            # Parameters containing unhashable values are simply not cached
+            return self.resolve(template, parameters)
+
+        if not resolved:
+            self.resolved[cache_key] = self.resolve(template, parameters)
+
+        return copy_data(self.resolved[cache_key])
+
+    def resolve(self, template, parameters=None):
         path_parts = template.split('/')
         branches = path_parts.pop().split('.')
         path_parts.append(branches.pop(0))
@@ -50,7 +65,6 @@ class ConfigTemplates(object):
 
             self.templates[template_path] = data
 
-        data = deepcopy(data)
         for i, branch in enumerate(branches):
             if isinstance(data, dict):
                 if branch in data:
@@ -77,6 +91,9 @@ class ConfigTemplates(object):
                     )
                 )
 
+        # Only copy the selected element as the parsed file is shared
+        data = copy_data(data)
+
         if parameters is None:
             parameters = {}
 
@@ -1,6 +1,40 @@
 # (C) Datadog, Inc. 2019
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+from copy import deepcopy
+
+# Types produced by YAML that can be shared rather than copied
+IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+
+def copy_data(data):
+    """
+    Recursively copy de-serialized YAML much faster than `copy.deepcopy`, which
+    needs to track every object it visits to support arbitrary graphs.
+    """
+    data_type = type(data)
+    if data_type is dict:
+        return {key: copy_data(value) for key, value in data.items()}
+    elif data_type is list:
+        return [copy_data(value) for value in data]
+    elif data_type in IMMUTABLE_TYPES:
+        return data
+    else:
+        return deepcopy(data)
+
+
+def freeze_data(data):
+    """
+    Recursively convert de-serialized YAML into a hashable form that, unlike JSON, keeps the type of
+    every key and value so that e.g. `1`, `True` and `'1'` remain distinct.
+    """
+    data_type = type(data)
+    if data_type is dict:
+        return data_type, frozenset((freeze_data(key), freeze_data(value)) for key, value in data.items())
+    elif data_type is list:
+        return data_type, tuple(freeze_data(value) for value in data)
+    else:
+        return data_type, data
 
 
 def default_option_example(option_name):
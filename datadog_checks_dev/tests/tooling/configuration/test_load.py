@@ -900,6 +900,33 @@ def test_option_secret_default():
     assert spec.data['files'][0]['options'][0]['options'][0]['secret'] is False
 
 
+def test_option_nested_errors_order():
+    spec = get_spec(
+        """
+        name: foo
+        version: 0.0.0
+        files:
+        - name: test.yaml
+          example_name: test.yaml.example
+          options:
+          - name: a
+            description: words
+            options:
+            - name: a1
+          - name: b
+            description: words
+            options:
+            - name: b1
+        """
+    )
+    spec.load()
+
+    assert spec.errors == [
+        'test, test.yaml, a, a1: Every option must contain a `description` attribute',
+        'test, test.yaml, b, b1: Every option must contain a `description` attribute',
+    ]
+
+
 def test_value_no_type():
     spec = get_spec(
         """
@@ -1042,6 +1069,36 @@ def test_value_type_string_example_not_string():
     assert 'test, test.yaml, instances, foo: Attribute `example` for `type` string must be a string' in spec.errors
 
 
+def test_value_shared_errors_reported_for_every_option():
+    spec = get_spec(
+        """
+        name: foo
+        version: 0.0.0
+        files:
+        - name: test.yaml
+          example_name: test.yaml.example
+          options:
+          - name: instances
+            description: words
+            options:
+            - name: foo
+              description: words
+              value: &value
+                type: array
+                items:
+                  type: string
+                  example: 123
+            - name: bar
+              description: words
+              value: *value
+        """
+    )
+    spec.load()
+
+    assert 'test, test.yaml, instances, foo: Attribute `example` for `type` string must be a string' in spec.errors
+    assert 'test, test.yaml, instances, bar: Attribute `example` for `type` string must be a string' in spec.errors
+
+
 def test_value_type_string_example_valid():
     spec = get_spec(
         """
@@ -1186,6 +1243,30 @@ def test_value_type_integer_example_not_number():
     assert 'test, test.yaml, instances, foo: Attribute `example` for `type` integer must be a number' in spec.errors
 
 
+def test_value_type_integer_example_boolean():
+    spec = get_spec(
+        """
+        name: foo
+        version: 0.0.0
+        files:
+        - name: test.yaml
+          example_name: test.yaml.example
+          options:
+          - name: instances
+            description: words
+            options:
+            - name: foo
+              description: words
+              value:
+                type: integer
+                example: true
+        """
+    )
+    spec.load()
+
+    assert 'test, test.yaml, instances, foo: Attribute `example` for `type` integer must be a number' in spec.errors
+
+
 def test_value_type_integer_example_valid():
     spec = get_spec(
         """
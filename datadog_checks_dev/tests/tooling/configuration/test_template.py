@@ -52,6 +52,25 @@ class TestLoadBasic:
 
             assert templates.load('init_config/tags') == {'test': ['foo', 'bar']}
 
+    def test_cache_resolved(self):
+        templates = ConfigTemplates()
+        parameters = {'overrides': {'value.example': ['foo:bar']}}
+
+        data = templates.load('init_config/tags', parameters)
+        data['value']['example'].append('baz:qux')
+
+        assert templates.load('init_config/tags', parameters)['value']['example'] == ['foo:bar']
+        assert templates.load('init_config/tags')['value']['example'] == ['<KEY_1>:<VALUE_1>', '<KEY_2>:<VALUE_2>']
+
+    def test_cache_resolved_key_types(self):
+        templates = ConfigTemplates()
+
+        data = templates.load('init_config/tags', {'overrides': {'value.example': {1: 'foo'}}})
+        assert data['value']['example'] == {1: 'foo'}
+
+        data = templates.load('init_config/tags', {'overrides': {'value.example': {'1': 'foo'}}})
+        assert data['value']['example'] == {'1': 'foo'}
+
     def test_unknown_template(self):
         templates = ConfigTemplates()
 